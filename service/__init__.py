@@ -18,11 +18,13 @@ Package for the application models and service routes
 This module creates and configures the Flask app and sets up the logging
 and SQL database
 """
+import os
 import sys
 from flask import Flask
 from flask_restx import Api
 from service import config
 from service.common import log_handlers
+from service.common.json_provider import ORJSONProvider, output_json
 
 # Document the type of authorization required
 # authorizations = {"apikey": {"type": "apiKey", "in": "header", "name": "X-Api-Key"}}
@@ -40,6 +42,22 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(config)
 
+    # Use orjson for all JSON serialization (much faster than json.dumps)
+    app.json = ORJSONProvider(app)
+
+    # Keep Flask-RESTX schema work off the request path
+    app.config["RESTX_VALIDATE"] = False
+    app.config["RESTX_MASK_SWAGGER"] = False
+
+    # Make sure debug machinery (traceback capture, exception propagation)
+    # never runs per-request outside of development
+    if os.getenv("FLASK_ENV", "production") != "development":
+        app.config.update(
+            DEBUG=False,
+            TESTING=False,
+            PROPAGATE_EXCEPTIONS=False,
+        )
+
     # Initialize Plugins
     # pylint: disable=import-outside-toplevel
     from service.models import db
@@ -61,6 +79,8 @@ def create_app():
         # authorizations=authorizations,
         prefix="/api",
     )
+    # Flask-RESTX has its own serializer so point it at orjson as well
+    api.representations["application/json"] = output_json
 
     with app.app_context():
         # Dependencies require we import the routes AFTER the Flask app is created
@@ -71,6 +91,11 @@ def create_app():
         )  # noqa: F401 E402 # pylint: disable=cyclic-import
         from service.common import error_handlers, cli_commands  # noqa: F401, E402
 
+        # Materialize the Swagger schema now so the first request
+        # doesn't pay for building (and caching) it
+        with app.test_request_context():
+            api.__schema__  # pylint: disable=pointless-statement
+
         try:
             db.create_all()
         except Exception as error:  # pylint: disable=broad-except
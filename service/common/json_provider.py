@@ -0,0 +1,57 @@
+######################################################################
+# Copyright 2016, 2024 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+######################################################################
+"""
+Module: json_provider
+
+Fast JSON serialization for the service using orjson
+
+Flask's default JSON provider goes through the pure Python json module
+which dominates response time on large list responses. This module plugs
+orjson into both Flask (via a JSONProvider) and Flask-RESTX (via a
+representation transformer) so every JSON response uses the same fast path.
+"""
+import orjson
+from flask import make_response
+from flask.json.provider import JSONProvider
+
+# Keep naive datetimes as UTC and allow numpy scalars should they ever appear
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        """Serialize an object to a JSON string"""
+        return orjson.dumps(obj, option=ORJSON_OPTIONS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string into an object"""
+        return orjson.loads(s)
+
+
+def dumps_bytes(obj):
+    """Serializes an object to JSON bytes with orjson"""
+    return orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX representation that serializes responses with orjson"""
+    response = make_response(orjson.dumps(data, option=ORJSON_OPTIONS), code)
+    response.mimetype = "application/json"
+    if headers:
+        response.headers.extend(headers)
+    return response
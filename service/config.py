@@ -13,7 +13,19 @@ DATABASE_URI = os.getenv(
 # Configure SQLAlchemy
 SQLALCHEMY_DATABASE_URI = DATABASE_URI
 SQLALCHEMY_TRACK_MODIFICATIONS = False
-# SQLALCHEMY_POOL_SIZE = 2
+
+# Connection pool sized for the gunicorn worker concurrency so request
+# handlers don't queue up waiting for a database connection.
+# LIFO checkout keeps recently used connections warm, pre-ping drops dead
+# connections before a request trips over them, and recycle stays under
+# typical load-balancer idle timeouts.
+SQLALCHEMY_ENGINE_OPTIONS = {
+    "pool_size": int(os.getenv("SQLALCHEMY_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", "40")),
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+    "pool_use_lifo": True,
+}
 
 # See if an API Key has been set for security
 API_KEY = os.getenv("API_KEY")
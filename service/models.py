@@ -5,6 +5,8 @@ All of the models are stored in this module
 """
 
 import logging
+import threading
+from cachetools import TTLCache
 from flask_sqlalchemy import SQLAlchemy
 
 logger = logging.getLogger("flask.app")
@@ -12,6 +14,42 @@ logger = logging.getLogger("flask.app")
 # Create the SQLAlchemy object to be initialized later in init_db()
 db = SQLAlchemy()
 
+# Short-lived in-process cache of serialized Recommendations keyed by id.
+# Repeat reads of hot ids become a dict lookup instead of a SELECT; every
+# write path invalidates the id it touched so staleness is bounded by the TTL.
+FIND_CACHE_SIZE = 10_000
+FIND_CACHE_TTL = 5  # seconds
+
+# Keep bulk insert transactions bounded
+BULK_CHUNK_SIZE = 500
+_find_cache = TTLCache(maxsize=FIND_CACHE_SIZE, ttl=FIND_CACHE_TTL)
+_find_cache_lock = threading.RLock()
+
+
+def _compile_serializer(field_names, datetime_fields=("last_updated", "created_at")):
+    """Generates a straight-line serializer for the given field names
+
+    Builds the function source once at import time (partial evaluation) so
+    each call is a single dict display with direct attribute access instead
+    of a loop over field names. Datetime fields are converted to ISO format.
+    """
+    parts = []
+    for name in field_names:
+        if name in datetime_fields:
+            parts.append(
+                f'"{name}": self.{name}.isoformat() if self.{name} else None'
+            )
+        else:
+            parts.append(f'"{name}": self.{name}')
+    source = (
+        "def serialize(self):\n"
+        '    """Serializes a Recommendation into a dictionary"""\n'
+        "    return {" + ", ".join(parts) + "}\n"
+    )
+    namespace = {}
+    exec(source, namespace)  # pylint: disable=exec-used
+    return namespace["serialize"]
+
 
 class DataValidationError(Exception):
     """Used for an data validation errors when deserializing"""
@@ -26,7 +64,7 @@ class Recommendations(db.Model):
     Class that represents a Recommendations
     """
 
-    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-instance-attributes, too-many-public-methods
 
     ##################################################
     # Table Schema
@@ -54,6 +92,20 @@ class Recommendations(db.Model):
     like = db.Column(db.Integer, default=0, nullable=False)
     dislike = db.Column(db.Integer, default=0, nullable=False)
 
+    # Field names serialized for every row of every response. serialize()
+    # below is compiled from this tuple once at import time.
+    _serialize_fields = (
+        "id",
+        "product_id",
+        "recommended_id",
+        "recommendation_type",
+        "status",
+        "last_updated",
+        "created_at",
+        "like",
+        "dislike",
+    )
+
     @property
     def product_id(self):
         """This property provides access to the product id."""
@@ -128,6 +180,7 @@ class Recommendations(db.Model):
         try:
             db.session.add(self)
             db.session.commit()
+            Recommendations.invalidate_cached(self.id)
         except Exception as e:
             db.session.rollback()
             logger.error(
@@ -138,6 +191,28 @@ class Recommendations(db.Model):
             )
             raise DataValidationError(e) from e
 
+    @classmethod
+    def create_all(cls, recommendations):
+        """
+        Saves a batch of Recommendations to the database
+
+        Inserts the whole batch with one commit (chunked to keep
+        transactions bounded) instead of paying a commit per row.
+
+        Args:
+            recommendations (list): the Recommendations to save
+        """
+        logger.info("Creating %d recommendations in bulk", len(recommendations))
+        try:
+            for start in range(0, len(recommendations), BULK_CHUNK_SIZE):
+                chunk = recommendations[start:start + BULK_CHUNK_SIZE]
+                db.session.add_all(chunk)
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Error bulk creating recommendations. Error: %s", str(e))
+            raise DataValidationError(e) from e
+
     def update(self):
         """
         Updates a Recommendation in the database, ensuring no concurrent modifications
@@ -154,6 +229,7 @@ class Recommendations(db.Model):
                 raise DataValidationError("The record was updated by another process.")
 
             db.session.commit()
+            Recommendations.invalidate_cached(self.id)
         except DataValidationError as e:
             db.session.rollback()
             logger.error("Data validation error: %s", str(e))
@@ -168,6 +244,50 @@ class Recommendations(db.Model):
             )
             raise DataValidationError(e) from e
 
+    @classmethod
+    def update_by_id(cls, by_id, data):
+        """Updates a Recommendation with a single UPDATE ... RETURNING
+
+        Validates the payload through the same setters as deserialize,
+        then writes every writable column in one statement, avoiding the
+        find-then-update round-trip and the race window between them.
+
+        Args:
+            by_id (int): the ID of the Recommendation to update
+            data (dict): the writable fields (product_id, recommended_id,
+                recommendation_type, status)
+
+        Returns:
+            dict: the serialized updated Recommendation, or None if not found
+        """
+        logger.info("Updating recommendation with id %s ...", by_id)
+        validated = cls().deserialize(data)
+        stmt = (
+            db.update(cls)
+            .where(cls.id == by_id)
+            .values(
+                _product_id=validated.product_id,
+                _recommended_id=validated.recommended_id,
+                _recommendation_type=validated.recommendation_type,
+                _status=validated.status,
+            )
+            .returning(cls)
+        )
+        try:
+            recommendation = db.session.execute(stmt).scalar_one_or_none()
+            # serialize before the commit expires the instance, otherwise
+            # reading the attributes afterwards triggers a refresh SELECT
+            result = recommendation.serialize() if recommendation else None
+            db.session.commit()
+            cls.invalidate_cached(by_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(
+                "Error updating recommendation with id %s. Error: %s", by_id, str(e)
+            )
+            raise DataValidationError(e) from e
+        return result
+
     def delete(self):
         """
         Removes a Recommendation from the database
@@ -180,6 +300,7 @@ class Recommendations(db.Model):
         try:
             db.session.delete(self)
             db.session.commit()
+            Recommendations.invalidate_cached(self.id)
         except Exception as e:
             db.session.rollback()
             logger.error(
@@ -190,21 +311,7 @@ class Recommendations(db.Model):
             )
             raise DataValidationError(e) from e
 
-    def serialize(self):
-        """Serializes a Recommendation into a dictionary"""
-        return {
-            "id": self.id,
-            "product_id": self.product_id,
-            "recommended_id": self.recommended_id,
-            "recommendation_type": self.recommendation_type,
-            "status": self.status,
-            "last_updated": (
-                self.last_updated.isoformat() if self.last_updated else None
-            ),
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "like": self.like,
-            "dislike": self.dislike,
-        }
+    serialize = _compile_serializer(_serialize_fields)
 
     def deserialize(self, data):
         """Deserialize a Recommendation from a dictionary"""
@@ -233,15 +340,141 @@ class Recommendations(db.Model):
     @classmethod
     def all(cls):
         """Returns all of the Recommendations in the database"""
-        logger.info("Processing all Recommendations")
+        logger.debug("Processing all Recommendations")
         return cls.query.all()
 
     @classmethod
     def find(cls, by_id):
         """Finds a Recommendation by its ID"""
-        logger.info("Processing lookup for id %s ...", by_id)
+        logger.debug("Processing lookup for id %s ...", by_id)
         return cls.query.session.get(cls, by_id)
 
+    @classmethod
+    def find_cached(cls, by_id):
+        """Finds a Recommendation by its ID, serving repeat reads from the cache
+
+        Returns the serialized dictionary rather than a model instance so the
+        cached value stays valid after the database session is removed.
+
+        Args:
+            by_id (int): the ID of the Recommendation to look up
+
+        Returns:
+            dict: the serialized Recommendation, or None if not found
+        """
+        with _find_cache_lock:
+            cached = _find_cache.get(by_id)
+        if cached is not None:
+            logger.debug("Cache hit for recommendation id %s", by_id)
+            return cached
+        recommendation = cls.find(by_id)
+        if recommendation is None:
+            return None
+        data = recommendation.serialize()
+        with _find_cache_lock:
+            _find_cache[by_id] = data
+        return data
+
+    @classmethod
+    def invalidate_cached(cls, by_id):
+        """Removes a Recommendation from the find cache after a write"""
+        with _find_cache_lock:
+            _find_cache.pop(by_id, None)
+
+    @classmethod
+    def clear_cache(cls):
+        """Empties the find cache
+
+        Bulk deletes that bypass the model (e.g. test fixtures issuing
+        query().delete()) never trigger per-id invalidation, so stale
+        entries could be served for reused ids.
+        """
+        with _find_cache_lock:
+            _find_cache.clear()
+
+    @classmethod
+    def increment_counter(cls, by_id, field):
+        """Atomically increments a counter column on a Recommendation
+
+        Runs a single UPDATE ... RETURNING statement so there is no
+        read-modify-write race window and only one database round-trip.
+
+        Args:
+            by_id (int): the ID of the Recommendation to update
+            field (str): the counter column to increment ("like" or "dislike")
+
+        Returns:
+            dict: the serialized updated Recommendation, or None if not found
+        """
+        logger.debug("Incrementing %s for recommendation id %s ...", field, by_id)
+        if field not in ("like", "dislike"):
+            raise DataValidationError(f"Invalid counter field: {field}")
+        stmt = (
+            db.update(cls)
+            .where(cls.id == by_id)
+            .values({field: getattr(cls, field) + 1})
+            .returning(cls)
+        )
+        try:
+            recommendation = db.session.execute(stmt).scalar_one_or_none()
+            # serialize before the commit expires the instance, otherwise
+            # reading the attributes afterwards triggers a refresh SELECT
+            data = recommendation.serialize() if recommendation else None
+            db.session.commit()
+            cls.invalidate_cached(by_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(
+                "Error incrementing %s for recommendation id %s. Error: %s",
+                field,
+                by_id,
+                str(e),
+            )
+            raise DataValidationError(e) from e
+        return data
+
+    @classmethod
+    def delete_by_id(cls, by_id):
+        """Deletes a Recommendation by its ID without loading the row
+
+        A single DELETE statement replaces the find-then-delete pattern,
+        so no columns are fetched or hydrated just to decide whether the
+        row exists.
+
+        Args:
+            by_id (int): the ID of the Recommendation to delete
+
+        Returns:
+            int: the number of rows deleted (0 or 1)
+        """
+        logger.info("Deleting recommendation with id %s ...", by_id)
+        try:
+            result = db.session.execute(db.delete(cls).where(cls.id == by_id))
+            db.session.commit()
+            cls.invalidate_cached(by_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(
+                "Error deleting recommendation with id %s. Error: %s", by_id, str(e)
+            )
+            raise DataValidationError(e) from e
+        return result.rowcount
+
+    @classmethod
+    def collection_summary(cls):
+        """Returns the latest last_updated and the row count
+
+        A cheap aggregate the list endpoint uses as an HTTP cache
+        validator without loading any rows.
+
+        Returns:
+            tuple: (max last_updated, count of Recommendations)
+        """
+        logger.debug("Processing collection summary ...")
+        return db.session.query(
+            db.func.max(cls.last_updated), db.func.count(cls.id)
+        ).one()
+
     @classmethod
     def find_by_product_id(cls, product_id):
         """Returns all Recommendations with the given product_id
@@ -249,7 +482,7 @@ class Recommendations(db.Model):
         Args:
             product_id (int): the ID of the product you want to match
         """
-        logger.info("Processing product_id query for %s ...", product_id)
+        logger.debug("Processing product_id query for %s ...", product_id)
         return cls.query.filter(cls._product_id == product_id).all()
 
     @classmethod
@@ -259,7 +492,7 @@ class Recommendations(db.Model):
         Args:
             recommended_id (int): the ID of the recommended product you want to match
         """
-        logger.info("Processing recommended_id query for %s ...", recommended_id)
+        logger.debug("Processing recommended_id query for %s ...", recommended_id)
         return cls.query.filter(cls._recommended_id == recommended_id).all()
 
     @classmethod
@@ -275,6 +508,8 @@ class Recommendations(db.Model):
                 - status (str): Status of the recommendation
                 - created_at_min (datetime): Minimum creation date
                 - created_at_max (datetime): Maximum creation date
+                - after_id (int): Keyset cursor, return rows with id greater
+                  than this value (takes precedence over page/sorting)
                 - page (int): Page number for pagination, default is 1
                 - limit (int): Number of results per page, default is 10
                 - sort_by (str): Field to sort by, default is "created_at"
@@ -289,8 +524,13 @@ class Recommendations(db.Model):
         # Apply filters, date range, sorting, and pagination
         query = cls._apply_filters(query, filters)
         query = cls._apply_date_range(query, filters)
-        query = cls._apply_sorting(query, filters)
-        query = cls._apply_pagination(query, filters)
+        if "after_id" in filters:
+            # Keyset pagination: a WHERE on the primary key costs the same
+            # for every page, unlike OFFSET which discards rows
+            query = cls._apply_keyset_pagination(query, filters)
+        else:
+            query = cls._apply_sorting(query, filters)
+            query = cls._apply_pagination(query, filters)
 
         return query.all()
 
@@ -339,6 +579,16 @@ class Recommendations(db.Model):
             )
         return query
 
+    @classmethod
+    def _apply_keyset_pagination(cls, query, filters):
+        """Apply keyset (seek) pagination based on the last id seen"""
+        limit = filters.get("limit", 10)
+        return (
+            query.filter(cls.id > filters["after_id"])
+            .order_by(cls.id.asc())
+            .limit(limit)
+        )
+
     @classmethod
     def _apply_pagination(cls, query, filters):
         """Apply pagination based on page and limit"""
@@ -22,12 +22,18 @@ and Delete Recommendations
 """
 # pylint: disable=unused-import
 # import secrets
+import base64
+import binascii
+import functools
+import hashlib
+import logging
 from flask_restx import Resource, fields, reqparse, inputs  # noqa: F401
-from flask import jsonify, request, abort
+from flask import Response, jsonify, make_response, request, stream_with_context, abort
 from flask import current_app as app  # Import Flask application
 from werkzeug.exceptions import BadRequest
 from service.models import Recommendations
 from service.common import status  # HTTP Status Codes
+from service.common.json_provider import dumps_bytes
 from . import api  # pylint: disable=cyclic-import
 
 
@@ -41,7 +47,7 @@ from . import api  # pylint: disable=cyclic-import
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint"""
-    app.logger.info("Health check endpoint called")
+    app.logger.debug("Health check endpoint called")
     return jsonify({"status": "OK"}), status.HTTP_200_OK
 
 
@@ -98,48 +104,79 @@ recommendation_model = api.inherit(
     },
 )
 
-# query string arguments
-recommendation_args = reqparse.RequestParser()
-recommendation_args.add_argument(
-    "product_id",
-    type=int,
-    location="args",
-    required=False,
-    help="List Recommendations by product id",
-)
-recommendation_args.add_argument(
-    "recommended_id",
-    type=int,
-    location="args",
-    required=False,
-    help="List Recommendations by recommended id",
-)
-recommendation_args.add_argument(
-    "recommendation_type",
-    type=str,
-    location="args",
-    required=False,
-    help="List Recommendations by type",
-)
-recommendation_args.add_argument(
-    "status",
-    type=str,
-    location="args",
-    required=False,
-    help="List Recommendations by status",
-)
-recommendation_args.add_argument(
-    "page", type=int, location="args", required=False, help="Pagination page number"
-)
-recommendation_args.add_argument(
-    "limit", type=int, location="args", required=False, help="Pagination limit per page"
-)
-recommendation_args.add_argument(
-    "sort_by", type=str, location="args", required=False, help="Sort by field"
-)
-recommendation_args.add_argument(
-    "order", type=str, location="args", required=False, help="Sort order (asc or desc)"
-)
+# Pagination defaults so the database always bounds the result set
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+# How long clients and intermediaries may serve GET responses without
+# revalidating; short enough that staleness is acceptable
+CACHE_MAX_AGE = 5  # seconds
+
+
+# query string arguments (Swagger documentation only; parsing is done by
+# filters_from_request to keep deprecated reqparse off the request path)
+def _build_recommendation_args():
+    """Builds the list endpoint's query-arg parser exactly once"""
+    parser = reqparse.RequestParser(trim=True, bundle_errors=True)
+    parser.add_argument(
+        "product_id",
+        type=int,
+        location="args",
+        required=False,
+        help="List Recommendations by product id",
+    )
+    parser.add_argument(
+        "recommended_id",
+        type=int,
+        location="args",
+        required=False,
+        help="List Recommendations by recommended id",
+    )
+    parser.add_argument(
+        "recommendation_type",
+        type=str,
+        location="args",
+        required=False,
+        help="List Recommendations by type",
+    )
+    parser.add_argument(
+        "status",
+        type=str,
+        location="args",
+        required=False,
+        help="List Recommendations by status",
+    )
+    parser.add_argument(
+        "page", type=int, location="args", required=False, help="Pagination page number"
+    )
+    parser.add_argument(
+        "limit",
+        type=int,
+        location="args",
+        required=False,
+        help="Pagination limit per page",
+    )
+    parser.add_argument(
+        "sort_by", type=str, location="args", required=False, help="Sort by field"
+    )
+    parser.add_argument(
+        "order",
+        type=str,
+        location="args",
+        required=False,
+        help="Sort order (asc or desc)",
+    )
+    parser.add_argument(
+        "cursor",
+        type=str,
+        location="args",
+        required=False,
+        help="Opaque cursor for keyset pagination (from the X-Next-Cursor header)",
+    )
+    return parser
+
+
+recommendation_args = _build_recommendation_args()
 
 
 ######################################################################
@@ -170,23 +207,24 @@ class RecommendationResource(Resource):
     # ------------------------------------------------------------------
     @api.doc("get_recommendations")
     @api.response(404, "Recommendation not found")
-    @api.marshal_with(recommendation_model)
+    @api.response(200, "Success", recommendation_model)
     def get(self, recommendation_id):
         """
         Retrieve a single Recommendation
 
         This endpoint will return a Recommendation based on it's id
         """
-        app.logger.info(
+        app.logger.debug(
             "Request to Retrieve a recommendation with id [%s]", recommendation_id
         )
-        recommendation = Recommendations.find(recommendation_id)
+        recommendation = Recommendations.find_cached(recommendation_id)
         if not recommendation:
             abort(
                 status.HTTP_404_NOT_FOUND,
                 f"Recommendation with id '{recommendation_id}' was not found.",
             )
-        return recommendation.serialize(), status.HTTP_200_OK
+        etag = f"{recommendation['id']}-{recommendation['last_updated']}"
+        return conditional_response(recommendation, etag)
 
     # ------------------------------------------------------------------
     # UPDATE AN EXISTING RECOMMENDATION
@@ -194,8 +232,8 @@ class RecommendationResource(Resource):
     @api.doc("update_recommendations")
     @api.response(404, "Recommendation not found")
     @api.response(400, "The posted Recommendation data was not valid")
+    @api.response(200, "Success", recommendation_model)
     @api.expect(recommendation_model)
-    @api.marshal_with(recommendation_model)
     def put(self, recommendation_id):
         """
         Update a Recommendation
@@ -205,18 +243,16 @@ class RecommendationResource(Resource):
         app.logger.info(
             "Request to Update a recommendation with id [%s]", recommendation_id
         )
-        recommendation = Recommendations.find(recommendation_id)
+        if app.logger.isEnabledFor(logging.DEBUG):
+            # api.payload parses the body, so don't touch it just for a log
+            app.logger.debug("Payload = %s", api.payload)
+        recommendation = Recommendations.update_by_id(recommendation_id, api.payload)
         if not recommendation:
             abort(
                 status.HTTP_404_NOT_FOUND,
                 f"Recommendation with id '{recommendation_id}' was not found.",
             )
-        app.logger.debug("Payload = %s", api.payload)
-        data = api.payload
-        recommendation.deserialize(data)
-        recommendation.id = recommendation_id
-        recommendation.update()
-        return recommendation.serialize(), status.HTTP_200_OK
+        return recommendation, status.HTTP_200_OK
 
     # ------------------------------------------------------------------
     # DELETE A RECOMMENDATION
@@ -232,9 +268,8 @@ class RecommendationResource(Resource):
         app.logger.info(
             "Request to Delete a recommendation with id [%s]", recommendation_id
         )
-        recommendation = Recommendations.find(recommendation_id)
-        if recommendation:
-            recommendation.delete()
+        deleted = Recommendations.delete_by_id(recommendation_id)
+        if deleted:
             app.logger.info(
                 "Recommendation with id [%s] was deleted", recommendation_id
             )
@@ -242,6 +277,26 @@ class RecommendationResource(Resource):
         return "", status.HTTP_204_NO_CONTENT
 
 
+@functools.lru_cache(maxsize=1)
+def _location_path_prefix():
+    """Builds the Location URL path prefix for new Recommendations exactly once
+
+    Werkzeug's URL map is nontrivial to walk per request, so resolve the
+    route a single time and fill in the id with string concatenation. Only
+    the path is cached; the scheme and host come from the current request
+    so deployments reached under several hostnames get the right one.
+    """
+    path = api.url_for(RecommendationResource, recommendation_id=0)
+    return path[: -len("0")]
+
+
+def _location_url(recommendation_id):
+    """Builds the external Location URL for a newly created Recommendation"""
+    return (
+        request.host_url[:-1] + _location_path_prefix() + str(recommendation_id)
+    )
+
+
 ######################################################################
 #  PATH: /recommendations
 ######################################################################
@@ -253,26 +308,50 @@ class RecommendationCollection(Resource):
     # LIST ALL RECOMMENDATIONS
     # ------------------------------------------------------------------
     @api.doc("list_recommendations")
-    @api.expect(recommendation_args, validate=True)
-    @api.marshal_list_with(recommendation_model)
+    @api.expect(recommendation_args)
+    @api.response(200, "Success", [recommendation_model])
     def get(self):
         """Returns all of the Recommendations"""
-        app.logger.info("Request to list Recommendations...")
-        recommendations = []
-        args = recommendation_args.parse_args()
-        filters = filters_from_args(args)
+        app.logger.debug("Request to list Recommendations...")
+        filters = filters_from_request()
+        etag = collection_etag()
+        if request.if_none_match.contains_weak(etag):
+            # Nothing changed since the client's copy; skip the whole
+            # query-and-serialize path
+            app.logger.debug("Recommendation list not modified")
+            response = make_response("", status.HTTP_304_NOT_MODIFIED)
+            response.set_etag(etag, weak=True)
+            return response
         recommendations = Recommendations.find_by_filters(filters)
-        app.logger.info("[%s] Recommendations returned", len(recommendations))
-        results = [recommendation.serialize() for recommendation in recommendations]
-        return results, status.HTTP_200_OK
+        app.logger.debug("[%s] Recommendations returned", len(recommendations))
+
+        def generate():
+            # Serialize and encode one row at a time so neither the list of
+            # dicts nor the full JSON string is ever held in memory at once
+            yield b"["
+            for i, recommendation in enumerate(recommendations):
+                if i:
+                    yield b","
+                yield dumps_bytes(recommendation.serialize())
+            yield b"]"
+
+        response = Response(
+            stream_with_context(generate()), mimetype="application/json"
+        )
+        response.set_etag(etag, weak=True)
+        response.cache_control.private = True
+        response.cache_control.max_age = CACHE_MAX_AGE
+        if "after_id" in filters and recommendations:
+            response.headers["X-Next-Cursor"] = encode_cursor(recommendations[-1].id)
+        return response
 
     # ------------------------------------------------------------------
     # ADD A NEW PET
     # ------------------------------------------------------------------
     @api.doc("create_recommendations")
     @api.response(400, "The posted data was not valid")
+    @api.response(201, "Recommendation created", recommendation_model)
     @api.expect(create_model)  # don't need to validate data in method
-    @api.marshal_with(recommendation_model, code=201)
     def post(self):
         """
         Creates a Recommendation
@@ -280,18 +359,47 @@ class RecommendationCollection(Resource):
         """
         app.logger.info("Request to Create a Recommendation")
         recommendation = Recommendations()
-        app.logger.debug("Payload = %s", api.payload)
+        if app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug("Payload = %s", api.payload)
         recommendation.deserialize(api.payload)
         recommendation.create()
         app.logger.info("Recommendation with new id [%s] created!", recommendation.id)
-        location_url = api.url_for(
-            RecommendationResource, recommendation_id=recommendation.id, _external=True
-        )
-        return (
-            recommendation.serialize(),
-            status.HTTP_201_CREATED,
-            {"Location": location_url},
-        )
+        # Serialize once; the orjson representation sends this dict as-is
+        payload = recommendation.serialize()
+        location_url = _location_url(recommendation.id)
+        return payload, status.HTTP_201_CREATED, {"Location": location_url}
+
+
+######################################################################
+#  PATH: /recommendations/bulk
+######################################################################
+@api.route("/recommendations/bulk", strict_slashes=False)
+class RecommendationBulkResource(Resource):
+    """Bulk create action on Recommendations"""
+
+    @api.doc("bulk_create_recommendations")
+    @api.response(400, "The posted data was not valid")
+    @api.response(201, "Recommendations created", [recommendation_model])
+    @api.expect([create_model])
+    def post(self):
+        """
+        Creates a batch of Recommendations
+
+        This endpoint will create all Recommendations in the posted list
+        with a single commit per chunk instead of one per row
+        """
+        app.logger.info("Request to Create Recommendations in bulk")
+        data = api.payload
+        if not isinstance(data, list):
+            abort(
+                status.HTTP_400_BAD_REQUEST,
+                "Expected a list of recommendations",
+            )
+        recommendations = [Recommendations().deserialize(item) for item in data]
+        Recommendations.create_all(recommendations)
+        app.logger.info("[%s] Recommendations created in bulk!", len(recommendations))
+        results = [recommendation.serialize() for recommendation in recommendations]
+        return results, status.HTTP_201_CREATED
 
 
 #######################################################################
@@ -310,21 +418,19 @@ class LikeResource(Resource):
 
         This endpoint will increment like of a Recommendation by 1
         """
-        app.logger.info(
+        app.logger.debug(
             "Request to like a recommendation with id: %d", recommendation_id
         )
-        recommendation = Recommendations.find(recommendation_id)
+        recommendation = Recommendations.increment_counter(recommendation_id, "like")
         if not recommendation:
             abort(
                 status.HTTP_404_NOT_FOUND,
                 f"Recommendation with id [{recommendation_id}] was not found.",
             )
-        recommendation.like += 1
-        recommendation.update()
-        app.logger.info(
-            "Recommendation with id [%s] has been liked!", recommendation.id
+        app.logger.debug(
+            "Recommendation with id [%s] has been liked!", recommendation["id"]
         )
-        return recommendation.serialize(), status.HTTP_200_OK
+        return recommendation, status.HTTP_200_OK
 
 
 #######################################################################
@@ -343,21 +449,21 @@ class DislikeResource(Resource):
 
         This endpoint will increment dislike of a Recommendation by 1
         """
-        app.logger.info(
+        app.logger.debug(
             "Request to dislike a recommendation with id: %d", recommendation_id
         )
-        recommendation = Recommendations.find(recommendation_id)
+        recommendation = Recommendations.increment_counter(
+            recommendation_id, "dislike"
+        )
         if not recommendation:
             abort(
                 status.HTTP_404_NOT_FOUND,
                 f"Recommendation with id [{recommendation_id}] was not found.",
             )
-        recommendation.dislike += 1
-        recommendation.update()
-        app.logger.info(
-            "Recommendation with id [%s] has been disliked!", recommendation.id
+        app.logger.debug(
+            "Recommendation with id [%s] has been disliked!", recommendation["id"]
         )
-        return recommendation.serialize(), status.HTTP_200_OK
+        return recommendation, status.HTTP_200_OK
 
 
 # ######################################################################
@@ -381,13 +487,38 @@ class DislikeResource(Resource):
 ######################################################################
 # HELPER FUNCTIONS FOR LIST ROUTE
 ######################################################################
-def parse_int_param(param_name):
-    """Helper function to parse integer query parameters"""
+def conditional_response(payload, etag):
+    """Builds a cacheable JSON response, returning 304 when the ETag matches"""
+    response = make_response(jsonify(payload))
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.max_age = CACHE_MAX_AGE
+    return response.make_conditional(request)
+
+
+def collection_etag():
+    """Computes a weak ETag for the current list request
+
+    Uses a cheap (max(last_updated), count) aggregate plus the query string
+    so a matching If-None-Match can skip the whole query-and-serialize path.
+    """
+    last_updated, count = Recommendations.collection_summary()
+    raw = f"{last_updated}-{count}-{request.query_string.decode('utf-8')}"
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def encode_cursor(last_id):
+    """Encodes the id of the last row returned into an opaque cursor"""
+    return base64.urlsafe_b64encode(str(last_id).encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor):
+    """Decodes an opaque cursor back into the id it was created from"""
     try:
-        return int(request.args.get(param_name))
-    except (ValueError, TypeError) as exc:
-        app.logger.error("Invalid %s", param_name)
-        raise BadRequest("Invalid data type: must be an integer") from exc
+        return int(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+    except (ValueError, binascii.Error) as exc:
+        app.logger.error("Invalid cursor [%s]", cursor)
+        raise BadRequest("Invalid cursor") from exc
 
 
 def validate_enum_param(param_name, value, valid_options):
@@ -398,35 +529,53 @@ def validate_enum_param(param_name, value, valid_options):
     return value
 
 
-def filters_from_args(args):
-    """Helper function to build filters dictionary from parsed args with custom validation"""
+# Query parameters accepted by the list endpoint, by how they are parsed
+INT_PARAMS = ("product_id", "recommended_id", "page", "limit")
+ENUM_PARAMS = {
+    "recommendation_type": ["cross-sell", "up-sell", "accessory"],
+    "status": ["active", "expired", "draft"],
+}
+STR_PARAMS = ("sort_by", "order")
+
+
+def filters_from_request():
+    """Helper function to build the filters dictionary from the query string
+
+    Makes a single pass over request.args instead of letting reqparse
+    (deprecated upstream) re-walk the args once per declared argument.
+    """
     filters = {}
-    if "product_id" in args and args["product_id"] is not None:
-        filters["product_id"] = parse_int_param("product_id")  # Validate as integer
-    if "recommended_id" in args and args["recommended_id"] is not None:
-        filters["recommended_id"] = parse_int_param(
-            "recommended_id"
-        )  # Validate as integer
-    if "page" in args and args["page"] is not None:
-        filters["page"] = parse_int_param("page")  # Validate as integer
-    if "limit" in args and args["limit"] is not None:
-        filters["limit"] = parse_int_param("limit")  # Validate as integer
-    if "recommendation_type" in args and args["recommendation_type"] is not None:
-        filters["recommendation_type"] = validate_enum_param(
-            "recommendation_type",
-            args["recommendation_type"],
-            ["cross-sell", "up-sell", "accessory"],
-        )
-    if "status" in args and args["status"] is not None:
-        filters["status"] = validate_enum_param(
-            "status",
-            args["status"],
-            ["active", "expired", "draft"],
+    for name, value in request.args.items():
+        if name in INT_PARAMS:
+            try:
+                filters[name] = int(value)
+            except ValueError as exc:
+                app.logger.error("Invalid %s", name)
+                raise BadRequest("Invalid data type: must be an integer") from exc
+        elif name in ENUM_PARAMS:
+            filters[name] = validate_enum_param(name, value, ENUM_PARAMS[name])
+        elif name in STR_PARAMS:
+            filters[name] = value
+        elif name == "cursor":
+            filters["after_id"] = decode_cursor(value)
+    if "after_id" not in filters and not any(
+        key in filters for key in ("page", "sort_by", "order")
+    ):
+        # Keyset pagination is the default: start from the beginning so the
+        # response hands the client its first cursor in X-Next-Cursor
+        filters["after_id"] = 0
+    if "page" in filters:
+        # OFFSET pagination scans and discards rows; steer clients to cursors
+        app.logger.warning(
+            "The 'page' parameter is deprecated; use 'cursor' for keyset pagination"
         )
-    if "sort_by" in args and args["sort_by"] is not None:
-        filters["sort_by"] = args["sort_by"]  # No additional validation needed
-    if "order" in args and args["order"] is not None:
-        filters["order"] = args["order"]  # No additional validation needed
+    # Always bound the query so the database, not Python, does the pagination;
+    # clamp to >= 1 so non-positive values can't become LIMIT -1 (the whole
+    # table on SQLite, an error on Postgres) or a negative OFFSET
+    filters["page"] = max(filters.get("page", 1), 1)
+    filters["limit"] = max(
+        min(filters.get("limit", DEFAULT_PAGE_LIMIT), MAX_PAGE_LIMIT), 1
+    )
     return filters
 
 
@@ -58,6 +58,7 @@ class TestRecommendations(TestCase):
         """This runs before each test"""
         db.session.query(Recommendations).delete()  # clean up the last tests
         db.session.commit()
+        Recommendations.clear_cache()  # the bulk delete bypasses invalidation
 
     def tearDown(self):
         """This runs after each test"""
@@ -157,6 +158,109 @@ class TestRecommendations(TestCase):
             with self.assertRaises(DataValidationError):
                 recommendation.delete()
 
+    def test_create_all_recommendations(self):
+        """It should Create a batch of recommendations with one commit"""
+        recommendations = [RecommendationsFactory() for _ in range(5)]
+        Recommendations.create_all(recommendations)
+        for recommendation in recommendations:
+            self.assertIsNotNone(recommendation.id)
+        found = Recommendations.all()
+        self.assertEqual(len(found), 5)
+
+    def test_create_all_recommendations_db_error(self):
+        """It should raise a DataValidationError when a bulk create fails"""
+        recommendations = [RecommendationsFactory() for _ in range(2)]
+        with patch(
+            "service.models.db.session.commit", side_effect=Exception("DB Error")
+        ):
+            with self.assertRaises(DataValidationError):
+                Recommendations.create_all(recommendations)
+
+    def test_find_cached(self):
+        """It should serve repeat reads from the cache until invalidated"""
+        recommendation = self._create_recommendations(1)[0]
+        first = Recommendations.find_cached(recommendation.id)
+        self.assertEqual(first["id"], recommendation.id)
+        # a second read comes from the cache and matches
+        second = Recommendations.find_cached(recommendation.id)
+        self.assertEqual(second, first)
+        # a write invalidates the cached entry
+        updated = Recommendations.increment_counter(recommendation.id, "like")
+        refreshed = Recommendations.find_cached(recommendation.id)
+        self.assertEqual(refreshed["like"], updated["like"])
+
+    def test_find_cached_not_found(self):
+        """It should return None from the cache for a missing id"""
+        self.assertIsNone(Recommendations.find_cached(0))
+
+    def test_update_by_id(self):
+        """It should update a recommendation with a single statement"""
+        recommendation = self._create_recommendations(1)[0]
+        new_data = {
+            "product_id": recommendation.product_id + 1,
+            "recommended_id": recommendation.recommended_id + 1,
+            "recommendation_type": "up-sell",
+            "status": "expired",
+        }
+        updated = Recommendations.update_by_id(recommendation.id, new_data)
+        self.assertIsNotNone(updated)
+        self.assertEqual(updated["product_id"], new_data["product_id"])
+        self.assertEqual(updated["recommended_id"], new_data["recommended_id"])
+        self.assertEqual(updated["recommendation_type"], "up-sell")
+        self.assertEqual(updated["status"], "expired")
+
+    def test_update_by_id_not_found(self):
+        """It should return None when updating a missing id"""
+        new_data = {
+            "product_id": 1,
+            "recommended_id": 101,
+            "recommendation_type": "up-sell",
+            "status": "expired",
+        }
+        self.assertIsNone(Recommendations.update_by_id(0, new_data))
+
+    def test_update_by_id_invalid_data(self):
+        """It should raise a DataValidationError for invalid update data"""
+        recommendation = self._create_recommendations(1)[0]
+        invalid_data = {
+            "product_id": recommendation.product_id,
+            "recommended_id": recommendation.recommended_id,
+            "recommendation_type": "invalid-type",
+            "status": recommendation.status,
+        }
+        with self.assertRaises(DataValidationError):
+            Recommendations.update_by_id(recommendation.id, invalid_data)
+
+    def test_increment_counter(self):
+        """It should atomically increment a counter column"""
+        recommendation = self._create_recommendations(1)[0]
+        original_like = recommendation.like or 0
+        updated = Recommendations.increment_counter(recommendation.id, "like")
+        self.assertIsNotNone(updated)
+        self.assertEqual(updated["like"], original_like + 1)
+
+    def test_increment_counter_not_found(self):
+        """It should return None when incrementing a counter of a missing id"""
+        updated = Recommendations.increment_counter(0, "dislike")
+        self.assertIsNone(updated)
+
+    def test_increment_counter_invalid_field(self):
+        """It should raise a DataValidationError for an invalid counter field"""
+        recommendation = self._create_recommendations(1)[0]
+        with self.assertRaises(DataValidationError):
+            Recommendations.increment_counter(recommendation.id, "status")
+
+    def test_delete_by_id(self):
+        """It should delete a recommendation without loading it first"""
+        recommendation = self._create_recommendations(1)[0]
+        deleted = Recommendations.delete_by_id(recommendation.id)
+        self.assertEqual(deleted, 1)
+        self.assertIsNone(Recommendations.find(recommendation.id))
+
+    def test_delete_by_id_not_found(self):
+        """It should report zero rows deleted for a missing id"""
+        self.assertEqual(Recommendations.delete_by_id(0), 0)
+
     def test_find_recommendation_not_found(self):
         """It should return None when a recommendation is not found"""
         recommendation = Recommendations.find(0)  # Using a non-existent ID
@@ -334,6 +438,22 @@ class TestRecommendations(TestCase):
         recommendations = Recommendations.find_by_filters(filters)
         self.assertEqual(len(recommendations), 5)
 
+    def test_find_by_filters_with_keyset_pagination(self):
+        """It should return keyset paginated results after a given id"""
+        # Create multiple recommendations
+        self._create_recommendations(15)
+
+        # Get the first page starting from the beginning
+        filters = {"after_id": 0, "limit": 10}
+        recommendations = Recommendations.find_by_filters(filters)
+        self.assertEqual(len(recommendations), 10)
+
+        # Get the next page starting after the last id seen
+        filters = {"after_id": recommendations[-1].id, "limit": 10}
+        next_page = Recommendations.find_by_filters(filters)
+        self.assertEqual(len(next_page), 5)
+        self.assertGreater(next_page[0].id, recommendations[-1].id)
+
     def test_find_by_filters_with_sorting(self):
         """It should return recommendations sorted by a specific field"""
         recommendation1 = RecommendationsFactory(
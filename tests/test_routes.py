@@ -60,6 +60,7 @@ class TestYourResourceService(TestCase):
         self.client = app.test_client()
         db.session.query(Recommendations).delete()  # clean up the last tests
         db.session.commit()
+        Recommendations.clear_cache()  # the bulk delete bypasses invalidation
 
     def tearDown(self):
         """This runs after each test"""
@@ -135,6 +136,19 @@ class TestYourResourceService(TestCase):
             test_recommendation.recommendation_type,
         )
 
+    def test_create_recommendation_location_host(self):
+        """It should build the Location header from the request's host"""
+        test_recommendation = RecommendationsFactory()
+        response = self.client.post(
+            BASE_URL,
+            json=test_recommendation.serialize(),
+            headers={"Host": "api.example.com"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        location = response.headers.get("Location", None)
+        self.assertIsNotNone(location)
+        self.assertIn("api.example.com", location)
+
     def test_create_recommendation_data_validation_error(self):
         """It should return 400 Bad Request when data validation fails"""
         # Simulate invalid data that will trigger a DataValidationError
@@ -201,6 +215,35 @@ class TestYourResourceService(TestCase):
     #     self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
     #     Recommendations.create = original_create
 
+    # ----------------------------------------------------------
+    # TEST BULK CREATE
+    # ----------------------------------------------------------
+    def test_bulk_create_recommendations(self):
+        """It should Create a batch of Recommendations in one request"""
+        batch = [RecommendationsFactory().serialize() for _ in range(3)]
+        response = self.client.post(f"{BASE_URL}/bulk", json=batch)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.get_json()
+        self.assertEqual(len(data), 3)
+        for created, sent in zip(data, batch):
+            self.assertIsNotNone(created["id"])
+            self.assertEqual(created["product_id"], sent["product_id"])
+            self.assertEqual(created["recommended_id"], sent["recommended_id"])
+
+    def test_bulk_create_recommendations_not_a_list(self):
+        """It should not bulk Create when the payload is not a list"""
+        recommendation = RecommendationsFactory().serialize()
+        response = self.client.post(f"{BASE_URL}/bulk", json=recommendation)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        data = response.get_json()
+        self.assertIn("Expected a list", data["message"])
+
+    def test_bulk_create_recommendations_invalid_item(self):
+        """It should not bulk Create when an item in the list is invalid"""
+        batch = [RecommendationsFactory().serialize(), {"product_id": "invalid"}]
+        response = self.client.post(f"{BASE_URL}/bulk", json=batch)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     # ----------------------------------------------------------
     # TEST READ
     # ----------------------------------------------------------
@@ -222,6 +265,32 @@ class TestYourResourceService(TestCase):
         logging.debug("Response data = %s", data)
         self.assertIn("was not found", data["message"])
 
+    def test_get_recommendation_etag(self):
+        """It should return 304 when the ETag matches on a single Recommendation"""
+        test_recommendation = self._create_recommendations(1)[0]
+        response = self.client.get(f"{BASE_URL}/{test_recommendation.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers.get("ETag", None)
+        self.assertIsNotNone(etag)
+        # revisiting with If-None-Match should short-circuit with 304
+        response = self.client.get(
+            f"{BASE_URL}/{test_recommendation.id}",
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(response.data), 0)
+
+    def test_list_recommendations_etag(self):
+        """It should return 304 when the ETag matches on the collection"""
+        self._create_recommendations(3)
+        response = self.client.get(BASE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers.get("ETag", None)
+        self.assertIsNotNone(etag)
+        response = self.client.get(BASE_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(response.data), 0)
+
     # ----------------------------------------------------------
     # TEST DELETE
     # ----------------------------------------------------------
@@ -386,6 +455,18 @@ class TestYourResourceService(TestCase):
         data = response.get_json()
         self.assertEqual(len(data), 10)
 
+    def test_list_recommendations_with_non_positive_pagination(self):
+        """It should clamp non-positive page and limit parameters"""
+        self._create_recommendations(5)
+        # a negative limit is clamped to 1 instead of leaking the whole table
+        response = self.client.get(f"{BASE_URL}?limit=-1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.get_json()), 1)
+        # page 0 behaves like page 1 instead of a negative OFFSET
+        response = self.client.get(f"{BASE_URL}?page=0&limit=10")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.get_json()), 5)
+
     def test_list_recommendations_with_invalid_page(self):
         """It should return 400 for an invalid page parameter"""
         response = self.client.get(f"{BASE_URL}?page=invalid")
@@ -407,6 +488,30 @@ class TestYourResourceService(TestCase):
             )
         )
 
+    def test_list_recommendations_with_cursor(self):
+        """It should page through recommendations with a keyset cursor"""
+        self._create_recommendations(15)
+        # the first cursor-less page already hands back the next cursor
+        response = self.client.get(f"{BASE_URL}?limit=10")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.get_json()
+        self.assertEqual(len(data), 10)
+        next_cursor = response.headers.get("X-Next-Cursor", None)
+        self.assertIsNotNone(next_cursor)
+        # the next page starts after the last id of the first page
+        response = self.client.get(f"{BASE_URL}?cursor={next_cursor}&limit=10")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        next_data = response.get_json()
+        self.assertEqual(len(next_data), 5)
+        self.assertGreater(next_data[0]["id"], data[-1]["id"])
+
+    def test_list_recommendations_with_invalid_cursor(self):
+        """It should return 400 for an invalid cursor parameter"""
+        response = self.client.get(f"{BASE_URL}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        data = response.get_json()
+        self.assertIn("Invalid cursor", data["message"])
+
     # ----------------------------------------------------------
     # TEST UPDATE - Successfully update a recommendation
     # ----------------------------------------------------------